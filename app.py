@@ -1,14 +1,86 @@
 import streamlit as st
 import requests
 import re
+import html
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dataclasses import dataclass, field, astuple
+from typing import Optional
 
-# Try to import BeautifulSoup with fallback
+# Try to import lxml with fallback
 try:
-    from bs4 import BeautifulSoup
-    BEAUTIFULSOUP_AVAILABLE = True
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+    
+    # GitHub serves raw files as UTF-8; without this libxml2 guesses the
+    # encoding for pages that lack a <meta charset> and garbles previews
+    HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
 except ImportError:
-    BEAUTIFULSOUP_AVAILABLE = False
-    st.warning("⚠️ beautifulsoup4 is not installed. Some features may be limited.")
+    LXML_AVAILABLE = False
+    st.warning("⚠️ lxml is not installed. Some features may be limited.")
+
+# Precompiled patterns for GitHub URL handling
+# Repository names may contain dots (e.g. user.github.io)
+GITHUB_URL_RE = re.compile(
+    r'https?://(?:github\.com/[\w\-]+/[\w.\-]+'
+    r'|raw\.githubusercontent\.com/[\w\-]+/[\w.\-]+/[\w\-/\.]+)'
+)
+GITHUB_BLOB_RE = re.compile(r'^(https?://)github\.com/([\w\-]+/[\w.\-]+)/blob/')
+GITHUB_REPO_RE = re.compile(r'github\.com/([\w\-]+)/([\w.\-]+)')
+
+def warm_up_connection(session):
+    """Open the TLS connection to GitHub before the first submission needs it"""
+    try:
+        session.head('https://raw.githubusercontent.com/', timeout=2)
+    except requests.RequestException:
+        pass
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Create the shared HTTP session once per server process, not on every rerun"""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    ))
+    threading.Thread(target=warm_up_connection, args=(session,), daemon=True).start()
+    return session
+
+# Shared HTTP session so repeated fetches reuse pooled keep-alive connections
+HTTP_SESSION = get_http_session()
+
+# DOCTYPE must open the document, after an optional UTF-8 BOM and any
+# whitespace or comments (which the HTML spec allows before it)
+DOCTYPE_RE = re.compile(rb'(?:\xef\xbb\xbf)?(?:\s|<!--.*?-->)*<!doctype\s+html\b',
+                        re.IGNORECASE | re.DOTALL)
+
+# Largest HTML file accepted for grading (a student page is a few hundred KB at most)
+MAX_HTML_BYTES = 2_000_000
+
+# Anything shorter than this cannot hold the required layout
+MIN_HTML_BYTES = 200
+
+# Any of these tags marks the body as HTML; <html>, <head> and <body> are all
+# optional in HTML5, so no single one of them can be required
+HTML_SNIFF_RE = re.compile(rb'<(?:!doctype|html|head|body)\b', re.IGNORECASE)
+
+# Bootstrap classes looked for by the graders
+COL_CLASSES = frozenset(f'col-{n}' for n in range(1, 13))
+JUSTIFY_SUFFIXES = frozenset({'center', 'start', 'end', 'between', 'around', 'evenly'})
+ALIGN_SUFFIXES = frozenset({'center', 'start', 'end', 'baseline', 'stretch'})
+HORIZ_CLASSES = frozenset('justify-content-' + s for s in JUSTIFY_SUFFIXES)
+VERT_CLASSES = frozenset('align-items-' + s for s in ALIGN_SUFFIXES)
+UTILITY_PREFIXES = ('bg-', 'text-', 'p-', 'm-', 'rounded', 'shadow', 'fs-', 'fw-')
+UTILITY_RE = re.compile('|'.join(re.escape(util) for util in UTILITY_PREFIXES))
+
+# Maps each graded class name to the scan bucket it belongs to
+CLASS_BUCKETS = {}
+CLASS_BUCKETS.update(dict.fromkeys(COL_CLASSES, 'columns'))
+CLASS_BUCKETS.update(dict.fromkeys(HORIZ_CLASSES, 'horizontal'))
+CLASS_BUCKETS.update(dict.fromkeys(VERT_CLASSES, 'vertical'))
 
 def main():
     # Set page configuration
@@ -22,14 +94,14 @@ def main():
     st.title("Mr Eyobed Sebrala Auto Grader")
     st.markdown("---")
     
-    # Check for beautifulsoup4
-    if not BEAUTIFULSOUP_AVAILABLE:
+    # Check for lxml
+    if not LXML_AVAILABLE:
         st.error("""
         ❌ **Required package missing!**
         
-        Please install beautifulsoup4 by:
+        Please install lxml by:
         1. Adding it to `requirements.txt`
-        2. Or run: `pip install beautifulsoup4==4.12.2`
+        2. Or run: `pip install lxml==4.9.3`
         """)
         return
     
@@ -46,8 +118,7 @@ def main():
 def grade_assignment(username, github_link):
     """Grade the student's assignment based on requirements"""
     
-    st.markdown("---")
-    st.subheader(f"Grading Results for: {username}")
+    st.markdown(f"---\n### Grading Results for: {username}")
     
     # Initialize score
     total_score = 0
@@ -63,30 +134,31 @@ def grade_assignment(username, github_link):
             st.error("Invalid GitHub URL. Please provide a valid GitHub repository link.")
             return
         
-        # Fetch HTML content from GitHub
-        html_content = fetch_html_from_github(github_link)
-        
-        if not html_content:
-            st.error("Could not fetch HTML content from the provided GitHub link.")
-            return
-        
-        # Parse HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Grade each requirement
-        results.append(grade_doctype(soup))
-        results.append(grade_container(soup))
-        results.append(grade_rows(soup))
-        results.append(grade_columns(soup))
-        results.append(grade_horizontal_alignment(soup))
-        results.append(grade_vertical_alignment(soup))
-        results.append(grade_bootstrap_css(soup))
-        results.append(grade_bootstrap_js(soup))
-        results.append(grade_specific_classes(soup))
-        results.append(grade_layout_structure(soup))
-        
-        # Calculate total score
-        total_score = sum([result['score'] for result in results])
+        with st.status("Grading your HTML...", expanded=True) as status:
+            # Fetch HTML content from GitHub
+            try:
+                html_content = fetch_html_from_github(github_link)
+            except HTMLTooLargeError:
+                status.update(label="Grading failed", state="error")
+                st.error(f"HTML file is too large to grade (limit is {MAX_HTML_BYTES // 1_000_000} MB).")
+                return
+            
+            if not html_content:
+                status.update(label="Grading failed", state="error")
+                st.error("Could not fetch HTML content from the provided GitHub link.")
+                return
+            
+            if len(html_content) < MIN_HTML_BYTES or not HTML_SNIFF_RE.search(html_content):
+                status.update(label="Grading failed", state="error")
+                st.error("The fetched file does not look like an HTML document.")
+                return
+            
+            # Grade each requirement
+            results = [GradeResult(*fields) for fields in grade_html(html_content)]
+            
+            # Calculate total score
+            total_score = sum(result.score for result in results)
+            status.update(label=f"Score: {total_score}/{max_score}", state="complete", expanded=False)
         
         # Display results
         col1, col2 = st.columns(2)
@@ -101,19 +173,22 @@ def grade_assignment(username, github_link):
         # Display detailed results
         st.markdown("### Detailed Breakdown:")
         
-        for result in results:
-            with st.expander(f"{result['requirement']} - {result['score']}/{result['max_score']} point(s)"):
-                if result['passed']:
-                    st.success("✅ " + result['feedback'])
-                else:
-                    st.error("❌ " + result['feedback'])
-                
-                if result.get('found_elements'):
-                    st.code(result['found_elements'], language='html')
+        st.table([
+            {
+                'Requirement': result.requirement,
+                'Score': f"{result.score}/{result.max_score}",
+                'Feedback': ("✅ " if result.passed else "❌ ") + result.feedback
+            }
+            for result in results
+        ])
+        
+        # Matched markup for every requirement, sent as a single element
+        found_elements_html = render_found_elements(results)
+        if found_elements_html:
+            st.markdown(found_elements_html, unsafe_allow_html=True)
         
         # Display final feedback
-        st.markdown("---")
-        st.subheader("Final Feedback")
+        st.markdown("---\n### Final Feedback")
         
         if total_score >= 9:
             st.success("🎉 Excellent work! All requirements are met perfectly!")
@@ -127,336 +202,325 @@ def grade_assignment(username, github_link):
     except Exception as e:
         st.error(f"An error occurred during grading: {str(e)}")
 
+def render_found_elements(results):
+    """Render each result's matched markup as a collapsible <details> block"""
+    blocks = []
+    for result in results:
+        if result.found_elements:
+            # Newlines are encoded so a blank line never ends the HTML block
+            code = html.escape(result.found_elements).replace('\n', '&#10;')
+            blocks.append(
+                f"<details><summary>{html.escape(result.requirement)} - found elements</summary>"
+                f"<pre><code>{code}</code></pre></details>"
+            )
+    return '\n'.join(blocks)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def grade_html(html_content):
+    """Parse the HTML and run every grader, cached per document"""
+    tree = lxml.html.document_fromstring(html_content, parser=HTML_PARSER)
+    
+    # Inline CSS and <noscript> fallbacks carry no graded markup; <script> is
+    # kept because the scan looks at its src
+    etree.strip_elements(tree, 'style', 'noscript', with_tail=False)
+    
+    # Collect Bootstrap elements in a single pass over the tree
+    scan = scan_document(tree)
+    
+    results = [
+        grade_doctype(html_content),
+        grade_container(scan),
+        grade_rows(scan),
+        grade_columns(scan),
+        grade_horizontal_alignment(scan),
+        grade_vertical_alignment(scan),
+        grade_bootstrap_css(scan),
+        grade_bootstrap_js(scan),
+        grade_specific_classes(scan),
+        grade_layout_structure(scan)
+    ]
+    
+    # Cache plain tuples: every Streamlit run installs a fresh __main__, so
+    # pickling GradeResult fails once another session has started a run
+    return [astuple(result) for result in results]
+
 def clean_github_url(url):
     """Clean and format GitHub URL"""
     # Remove trailing slash
     url = url.rstrip('/')
     
-    # If it's a GitHub repo URL, convert to raw content URL
-    if 'github.com' in url and 'blob' in url:
-        # Convert to raw URL
-        url = url.replace('github.com', 'raw.githubusercontent.com')
-        url = url.replace('/blob/', '/')
-    
-    return url
+    # If it's a GitHub file URL, convert to raw content URL
+    return GITHUB_BLOB_RE.sub(r'\1raw.githubusercontent.com/\2/', url, count=1)
 
 def is_valid_github_url(url):
     """Check if URL is a valid GitHub URL"""
-    github_patterns = [
-        r'https?://github\.com/[\w\-]+/[\w\-]+',
-        r'https?://raw\.githubusercontent\.com/[\w\-]+/[\w\-]+/[\w\-/\.]+'
-    ]
-    
-    for pattern in github_patterns:
-        if re.match(pattern, url):
-            return True
-    return False
+    return GITHUB_URL_RE.match(url) is not None
+
+class HTMLTooLargeError(Exception):
+    """Raised when a fetched file is over MAX_HTML_BYTES"""
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def fetch_url(url):
+    """Download a URL, cached briefly; errors raise so they are never cached"""
+    with HTTP_SESSION.get(url, stream=True, timeout=10) as response:
+        response.raise_for_status()
+        
+        # raw.githubusercontent.com serves .html files as text/plain, so only
+        # reject bodies that are not text at all (images, archives, ...)
+        content_type = response.headers.get('content-type', '')
+        if content_type and not content_type.startswith('text/'):
+            raise ValueError(f"Unexpected content type: {content_type}")
+        
+        content_length = response.headers.get('content-length', '')
+        if content_length.isdigit() and int(content_length) > MAX_HTML_BYTES:
+            raise HTMLTooLargeError(url)
+        
+        # Stop reading once past the size limit and raise, so an oversized
+        # file is neither downloaded in full nor kept in the cache
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=65536):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > MAX_HTML_BYTES:
+                raise HTMLTooLargeError(url)
+    
+    return b''.join(chunks)
 
 def fetch_html_from_github(url):
-    """Fetch HTML content from GitHub"""
+    """Fetch HTML content from GitHub; raises HTMLTooLargeError for oversized files"""
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.text
+        return fetch_url(url)
+    except HTMLTooLargeError:
+        raise
     except:
         # Try alternative approach - look for index.html
         try:
             if 'raw.githubusercontent.com' not in url:
                 # Extract user and repo from URL
-                match = re.search(r'github\.com/([\w\-]+)/([\w\-]+)', url)
+                match = GITHUB_REPO_RE.search(url)
                 if match:
                     user, repo = match.groups()
                     raw_url = f"https://raw.githubusercontent.com/{user}/{repo}/main/index.html"
-                    response = requests.get(raw_url, timeout=10)
-                    response.raise_for_status()
-                    return response.text
+                    return fetch_url(raw_url)
+        except HTMLTooLargeError:
+            raise
         except:
             return None
     return None
 
-def grade_doctype(soup):
+def to_html(element):
+    """Serialize an element (without its tail text) for feedback previews"""
+    return lxml.html.tostring(element, encoding='unicode', with_tail=False)
+
+def preview(element, length):
+    """Return the first `length` characters of to_html(element), serializing
+    only as much of the subtree as is needed to fill them"""
+    if not isinstance(element.tag, str) or len(element) == 0:
+        # Comments and leaf elements are cheap to serialize whole
+        return to_html(element)[:length]
+    
+    # Opening tag and leading text: serialize the element itself with its
+    # children detached for a moment, so the tag and attributes come out
+    # exactly as lxml writes them (no name re-validation, valueless
+    # attributes stay valueless)
+    children = list(element)
+    del element[:]
+    try:
+        start = to_html(element)
+    finally:
+        element.extend(children)
+    end_tag = f'</{element.tag}>'
+    if start.endswith(end_tag):
+        start = start[:-len(end_tag)]
+    else:
+        end_tag = ''
+    
+    parts = [start]
+    size = len(start)
+    for child in element:
+        if size >= length:
+            break
+        part = preview(child, length - size) + html.escape(child.tail or '', quote=False)
+        parts.append(part)
+        size += len(part)
+    parts.append(end_tag)
+    
+    return ''.join(parts)[:length]
+
+@dataclass
+class GradeResult:
+    """Outcome of a single grading requirement"""
+    requirement: str
+    passed: bool
+    score: int
+    max_score: int
+    feedback: str
+    found_elements: Optional[str] = None
+
+@dataclass
+class DocumentScan:
+    """Elements collected by scan_document for the graders"""
+    container: object = None
+    rows: list = field(default_factory=list)
+    columns: list = field(default_factory=list)
+    horizontal: list = field(default_factory=list)
+    vertical: list = field(default_factory=list)
+    utility_count: int = 0
+    utility_examples: dict = field(default_factory=dict)
+    bootstrap_links: list = field(default_factory=list)
+    bootstrap_scripts: list = field(default_factory=list)
+
+def scan_document(tree):
+    """Classify every element once into the buckets used by the graders"""
+    scan = DocumentScan()
+    
+    # Element-only iteration skips comments and processing instructions
+    for element in tree.iter(etree.Element):
+        if element.tag == 'link':
+            href = element.get('href', '').lower()
+            if 'bootstrap' in href and href.endswith('.css'):
+                scan.bootstrap_links.append(element)
+        elif element.tag == 'script':
+            if 'bootstrap' in element.get('src', '').lower():
+                scan.bootstrap_scripts.append(element)
+        
+        classes = element.get('class', '').split()
+        if not classes:
+            continue
+        
+        if element.tag == 'div':
+            if scan.container is None and 'container' in classes:
+                scan.container = element
+            if 'row' in classes:
+                scan.rows.append(element)
+        
+        # One lookup per class, each bucket gets the element at most once
+        for bucket in {CLASS_BUCKETS[c] for c in classes if c in CLASS_BUCKETS}:
+            getattr(scan, bucket).append(element)
+        
+        # The match is the utility prefix itself, none is a prefix of another
+        utilities = {match.group() for match in map(UTILITY_RE.match, classes) if match}
+        scan.utility_count += len(utilities)
+        for util in utilities:
+            scan.utility_examples.setdefault(util, element)
+    
+    return scan
+
+def make_result(requirement, passed, feedback, found_elements=None, max_score=1):
+    """Build a GradeResult, awarding the full score only when passed"""
+    return GradeResult(requirement, passed, max_score if passed else 0, max_score,
+                       feedback, found_elements)
+
+def grade_doctype(html_content):
     """Check for DOCTYPE declaration"""
     requirement = "DOCTYPE Declaration"
-    max_score = 1
     
-    if soup.original_encoding and '<!DOCTYPE html>' in str(soup):
-        return {
-            'requirement': requirement,
-            'passed': True,
-            'score': max_score,
-            'max_score': max_score,
-            'feedback': 'DOCTYPE declaration found.',
-            'found_elements': '<!DOCTYPE html>'
-        }
-    else:
-        return {
-            'requirement': requirement,
-            'passed': False,
-            'score': 0,
-            'max_score': max_score,
-            'feedback': 'DOCTYPE declaration missing or incorrect.'
-        }
-
-def grade_container(soup):
+    # The match is anchored, so it only reads the prologue before the DOCTYPE
+    if DOCTYPE_RE.match(html_content):
+        return make_result(requirement, True, 'DOCTYPE declaration found.', '<!DOCTYPE html>')
+    return make_result(requirement, False, 'DOCTYPE declaration missing or incorrect.')
+
+def grade_container(scan):
     """Check for Bootstrap container"""
     requirement = "Bootstrap Container"
-    max_score = 1
     
-    container = soup.find('div', class_='container')
-    if container:
-        return {
-            'requirement': requirement,
-            'passed': True,
-            'score': max_score,
-            'max_score': max_score,
-            'feedback': 'Bootstrap container found.',
-            'found_elements': str(container)[:200] + '...' if len(str(container)) > 200 else str(container)
-        }
-    else:
-        return {
-            'requirement': requirement,
-            'passed': False,
-            'score': 0,
-            'max_score': max_score,
-            'feedback': 'No Bootstrap container found.'
-        }
-
-def grade_rows(soup):
+    container = scan.container
+    if container is not None:
+        snippet = preview(container, 201)
+        return make_result(requirement, True, 'Bootstrap container found.',
+                           snippet[:200] + '...' if len(snippet) > 200 else snippet)
+    return make_result(requirement, False, 'No Bootstrap container found.')
+
+def grade_rows(scan):
     """Check for Bootstrap rows"""
     requirement = "Bootstrap Rows"
-    max_score = 1
     
-    rows = soup.find_all('div', class_='row')
+    rows = scan.rows
     if len(rows) >= 4:  # Looking for at least 4 rows as in the example
-        return {
-            'requirement': requirement,
-            'passed': True,
-            'score': max_score,
-            'max_score': max_score,
-            'feedback': f'Found {len(rows)} Bootstrap rows.',
-            'found_elements': '\n\n'.join([str(row)[:150] + '...' for row in rows[:3]])
-        }
-    else:
-        return {
-            'requirement': requirement,
-            'passed': False,
-            'score': 0,
-            'max_score': max_score,
-            'feedback': f'Only found {len(rows)} row(s). Expected at least 4.'
-        }
-
-def grade_columns(soup):
+        return make_result(requirement, True, f'Found {len(rows)} Bootstrap rows.',
+                           '\n\n'.join([preview(row, 150) + '...' for row in rows[:3]]))
+    return make_result(requirement, False, f'Only found {len(rows)} row(s). Expected at least 4.')
+
+def grade_columns(scan):
     """Check for Bootstrap columns"""
     requirement = "Bootstrap Columns"
-    max_score = 1
-    
-    # Look for various column classes
-    col_classes = ['col-1', 'col-2', 'col-3', 'col-4', 'col-5', 'col-6', 
-                   'col-7', 'col-8', 'col-9', 'col-10', 'col-11', 'col-12']
-    
-    columns = []
-    for col_class in col_classes:
-        columns.extend(soup.find_all(class_=lambda x: x and col_class in x.split()))
     
+    columns = scan.columns
     if len(columns) >= 8:  # Looking for multiple columns
-        return {
-            'requirement': requirement,
-            'passed': True,
-            'score': max_score,
-            'max_score': max_score,
-            'feedback': f'Found {len(columns)} Bootstrap columns.',
-            'found_elements': '\n\n'.join([str(col)[:100] + '...' for col in columns[:5]])
-        }
-    else:
-        return {
-            'requirement': requirement,
-            'passed': False,
-            'score': 0,
-            'max_score': max_score,
-            'feedback': f'Only found {len(columns)} column(s). Expected multiple columns.'
-        }
-
-def grade_horizontal_alignment(soup):
+        return make_result(requirement, True, f'Found {len(columns)} Bootstrap columns.',
+                           '\n\n'.join([preview(col, 100) + '...' for col in columns[:5]]))
+    return make_result(requirement, False, f'Only found {len(columns)} column(s). Expected multiple columns.')
+
+def grade_horizontal_alignment(scan):
     """Check for horizontal alignment classes"""
     requirement = "Horizontal Alignment"
-    max_score = 1
-    
-    # Check for horizontal alignment classes
-    horiz_classes = ['justify-content-center', 'justify-content-start', 
-                     'justify-content-end', 'justify-content-between', 
-                     'justify-content-around']
-    
-    found = []
-    for h_class in horiz_classes:
-        elements = soup.find_all(class_=lambda x: x and h_class in x.split())
-        found.extend(elements)
     
+    found = scan.horizontal
     if found:
-        return {
-            'requirement': requirement,
-            'passed': True,
-            'score': max_score,
-            'max_score': max_score,
-            'feedback': f'Found horizontal alignment classes ({len(found)} instances).',
-            'found_elements': '\n'.join([str(element)[:150] for element in found[:3]])
-        }
-    else:
-        return {
-            'requirement': requirement,
-            'passed': False,
-            'score': 0,
-            'max_score': max_score,
-            'feedback': 'No horizontal alignment classes found.'
-        }
-
-def grade_vertical_alignment(soup):
+        return make_result(requirement, True, f'Found horizontal alignment classes ({len(found)} instances).',
+                           '\n'.join([preview(element, 150) for element in found[:3]]))
+    return make_result(requirement, False, 'No horizontal alignment classes found.')
+
+def grade_vertical_alignment(scan):
     """Check for vertical alignment classes"""
     requirement = "Vertical Alignment"
-    max_score = 1
-    
-    # Check for vertical alignment classes
-    vert_classes = ['align-items-center', 'align-items-start', 
-                    'align-items-end', 'align-items-baseline', 
-                    'align-items-stretch']
-    
-    found = []
-    for v_class in vert_classes:
-        elements = soup.find_all(class_=lambda x: x and v_class in x.split())
-        found.extend(elements)
     
+    found = scan.vertical
     if found:
-        return {
-            'requirement': requirement,
-            'passed': True,
-            'score': max_score,
-            'max_score': max_score,
-            'feedback': f'Found vertical alignment classes ({len(found)} instances).',
-            'found_elements': '\n'.join([str(element)[:150] for element in found[:3]])
-        }
-    else:
-        return {
-            'requirement': requirement,
-            'passed': False,
-            'score': 0,
-            'max_score': max_score,
-            'feedback': 'No vertical alignment classes found.'
-        }
-
-def grade_bootstrap_css(soup):
+        return make_result(requirement, True, f'Found vertical alignment classes ({len(found)} instances).',
+                           '\n'.join([preview(element, 150) for element in found[:3]]))
+    return make_result(requirement, False, 'No vertical alignment classes found.')
+
+def grade_bootstrap_css(scan):
     """Check for Bootstrap CSS inclusion"""
     requirement = "Bootstrap CSS Link"
-    max_score = 1
-    
-    # Check for Bootstrap CSS link
-    bootstrap_css_links = soup.find_all('link', href=lambda x: x and 'bootstrap' in x.lower())
     
+    bootstrap_css_links = scan.bootstrap_links
     if bootstrap_css_links:
-        return {
-            'requirement': requirement,
-            'passed': True,
-            'score': max_score,
-            'max_score': max_score,
-            'feedback': 'Bootstrap CSS link found.',
-            'found_elements': '\n'.join([str(link) for link in bootstrap_css_links])
-        }
-    else:
-        return {
-            'requirement': requirement,
-            'passed': False,
-            'score': 0,
-            'max_score': max_score,
-            'feedback': 'Bootstrap CSS link not found.'
-        }
-
-def grade_bootstrap_js(soup):
+        return make_result(requirement, True, 'Bootstrap CSS link found.',
+                           '\n'.join([to_html(link) for link in bootstrap_css_links]))
+    return make_result(requirement, False, 'Bootstrap CSS link not found.')
+
+def grade_bootstrap_js(scan):
     """Check for Bootstrap JS inclusion"""
     requirement = "Bootstrap JS Script"
-    max_score = 1
-    
-    # Check for Bootstrap JS script
-    bootstrap_js_scripts = soup.find_all('script', src=lambda x: x and 'bootstrap' in x.lower())
     
+    bootstrap_js_scripts = scan.bootstrap_scripts
     if bootstrap_js_scripts:
-        return {
-            'requirement': requirement,
-            'passed': True,
-            'score': max_score,
-            'max_score': max_score,
-            'feedback': 'Bootstrap JS script found.',
-            'found_elements': '\n'.join([str(script) for script in bootstrap_js_scripts])
-        }
-    else:
-        return {
-            'requirement': requirement,
-            'passed': False,
-            'score': 0,
-            'max_score': max_score,
-            'feedback': 'Bootstrap JS script not found.'
-        }
-
-def grade_specific_classes(soup):
+        return make_result(requirement, True, 'Bootstrap JS script found.',
+                           '\n'.join([to_html(script) for script in bootstrap_js_scripts]))
+    return make_result(requirement, False, 'Bootstrap JS script not found.')
+
+def grade_specific_classes(scan):
     """Check for specific Bootstrap utility classes"""
     requirement = "Bootstrap Utility Classes"
-    max_score = 1
-    
-    # Check for common Bootstrap utility classes
-    utility_classes = ['bg-', 'text-', 'p-', 'm-', 'rounded', 'shadow', 'fs-', 'fw-']
-    
-    found_count = 0
-    found_examples = []
-    
-    for util in utility_classes:
-        elements = soup.find_all(class_=lambda x: x and util in x)
-        found_count += len(elements)
-        if elements and len(found_examples) < 3:
-            found_examples.append(str(elements[0])[:150])
     
+    found_count = scan.utility_count
     if found_count >= 10:  # Looking for multiple utility classes
-        return {
-            'requirement': requirement,
-            'passed': True,
-            'score': max_score,
-            'max_score': max_score,
-            'feedback': f'Found {found_count} Bootstrap utility class instances.',
-            'found_elements': '\n\n'.join(found_examples)
-        }
-    else:
-        return {
-            'requirement': requirement,
-            'passed': False,
-            'score': 0,
-            'max_score': max_score,
-            'feedback': f'Only found {found_count} utility class instances. Expected more.'
-        }
-
-def grade_layout_structure(soup):
+        # First match of each utility, in UTILITY_PREFIXES order
+        examples = [scan.utility_examples[util] for util in UTILITY_PREFIXES
+                    if util in scan.utility_examples]
+        return make_result(requirement, True, f'Found {found_count} Bootstrap utility class instances.',
+                           '\n\n'.join([preview(element, 150) for element in examples[:3]]))
+    return make_result(requirement, False, f'Only found {found_count} utility class instances. Expected more.')
+
+def grade_layout_structure(scan):
     """Check overall layout structure"""
     requirement = "Layout Structure"
-    max_score = 1
     
     # Check for structured layout with multiple sections
-    container = soup.find('div', class_='container')
-    if container:
-        # Count direct child rows
-        rows = container.find_all('div', class_='row', recursive=False)
+    container = scan.container
+    if container is not None:
+        # Count direct child rows, reusing the rows found by the scan
+        row_count = sum(1 for row in scan.rows if row.getparent() is container)
         
-        if len(rows) >= 3:  # At least 3 main sections
-            return {
-                'requirement': requirement,
-                'passed': True,
-                'score': max_score,
-                'max_score': max_score,
-                'feedback': f'Good layout structure with {len(rows)} main sections.',
-                'found_elements': f'Container with {len(rows)} direct child rows'
-            }
+        if row_count >= 3:  # At least 3 main sections
+            return make_result(requirement, True, f'Good layout structure with {row_count} main sections.',
+                               f'Container with {row_count} direct child rows')
     
-    return {
-        'requirement': requirement,
-        'passed': False,
-        'score': 0,
-        'max_score': max_score,
-        'feedback': 'Layout structure needs improvement. Should have container with multiple row sections.'
-    }
+    return make_result(requirement, False,
+                       'Layout structure needs improvement. Should have container with multiple row sections.')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file